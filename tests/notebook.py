@@ -613,6 +613,23 @@ class TestUpdateLinksOnMovePage(tests.TestCase):
 			)
 		)
 
+	def testFloatingLinkBackToMovedSectionRoot(self):
+		# Regression test for moving a section whose child pages link
+		# back to the section root: the move must complete and leave
+		# the index consistent also when a moved page needs no text
+		# change and is therefore not stored again
+		self.movePage(
+			pre=(
+				{'Foo:Child': '[[Foo]]\n'},
+				[('Foo:Child', 'Foo')]
+			),
+			move=('Foo', 'Moved'),
+			post=(
+				{'Moved': '', 'Moved:Child': '[[Moved]]\n'},
+				[('Moved:Child', 'Moved')]
+			)
+		)
+
 	def testFloatingLinkOnceRemoved(self):
 		self.movePage(
 			pre=(
@@ -910,13 +910,13 @@ class HierarchicDictFrame(object):
 		self.key = key
 
 	def _keys(self):
-		yield self.key
-		parts = self.key.split(':')
-		parts.pop()
-		while parts:
-			yield ':'.join(parts)
-			parts.pop()
-		yield '' # top level namespace
+		# Strip off the parts one by one instead of re-joining the
+		# remaining parts for every level
+		key = self.key
+		yield key
+		while key:
+			key = key.rpartition(':')[0]
+			yield key # ends with '' for the top level namespace
 
 	def get(self, k, default=None):
 		try:
@@ -927,12 +927,14 @@ class HierarchicDictFrame(object):
 			return v
 
 	def __getitem__(self, k):
+		dict = self.dict
 		for key in self._keys():
-			if key in self.dict and k in self.dict[key]:
-				return self.dict[key][k]
+			props = dict.get(key)
+			if props is not None and k in props:
+				return props[k]
 		else:
-			if k in self.dict['__defaults__']:
-				return self.dict['__defaults__'][k]
+			if k in dict['__defaults__']:
+				return dict['__defaults__'][k]
 			else:
 				raise KeyError
 
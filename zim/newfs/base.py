@@ -5,6 +5,7 @@
 
 import os
 import re
+import sys
 import hashlib
 import contextlib
 
@@ -225,12 +226,15 @@ class FilePath(object):
 	("file:///" or "smb://") or list of path names.
 	'''
 
-	__slots__ = ('path', 'pathnames', 'islocal')
+	__slots__ = ('path', 'pathnames', 'islocal', '_userpath')
 
 	def __init__(self, path):
 		if isinstance(path, (tuple, list, str)):
 			self.pathnames = _splitnormpath(path)
-			self.path = _joinabspath(self.pathnames)
+			self.path = sys.intern(_joinabspath(self.pathnames))
+				# The same paths (roots, attachment folders) are
+				# constructed over and over; interning shares one copy
+				# and lets equality checks short-circuit on identity
 		elif isinstance(path, FilePath):
 			self.pathnames = path.pathnames
 			self.path = path.path
@@ -238,6 +242,7 @@ class FilePath(object):
 			raise TypeError('Cannot convert %r to a FilePath' % path)
 
 		self.islocal = not self.pathnames[0].startswith('\\\\')
+		self._userpath = None
 
 	def __repr__(self):
 		return "<%s: %s>" % (self.__class__.__name__, self.path)
@@ -276,10 +281,14 @@ class FilePath(object):
 
 	@property
 	def userpath(self):
-		if self.ischild(_HOME):
-			return '~' + SEP + self.relpath(_HOME)
-		else:
-			return self.path
+		# Computed lazily and cached - paths are immutable, but objects
+		# like icons get serialized repeatedly
+		if self._userpath is None:
+			if self.ischild(_HOME):
+				self._userpath = '~' + SEP + self.relpath(_HOME)
+			else:
+				self._userpath = self.path
+		return self._userpath
 
 	def get_childpath(self, path):
 		assert path
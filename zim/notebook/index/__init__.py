@@ -204,8 +204,22 @@ class Index(SignalEmitter):
 		self.background_check.stop()
 
 	def update_file(self, file):
+		if self._update_file(file):
+			self._commit_partial_update()
+
+	def update_files(self, files):
+		'''Like L{update_file()} but processes multiple files with a
+		single update pass and a single commit.
+		'''
+		update = False
+		for file in files:
+			update = self._update_file(file) or update
+		if update:
+			self._commit_partial_update()
+
+	def _update_file(self, file):
 		if not file.exists():
-			return self.remove_file(file)
+			return self._remove_file(file)
 
 		path = file.relpath(self.layout.root)
 		row = self._db.execute('SELECT id FROM files WHERE path=?', (path,)).fetchone()
@@ -228,17 +242,17 @@ class Index(SignalEmitter):
 			else:
 				raise TypeError
 
-		for i in self.update_iter.partial_update_iter():
-			pass
-
-		self._db.commit()
-		self.on_commit(None)
+		return True
 
 	def remove_file(self, file):
+		if self._remove_file(file):
+			self._commit_partial_update()
+
+	def _remove_file(self, file):
 		path = file.relpath(self.layout.root)
 		row = self._db.execute('SELECT id FROM files WHERE path=?', (path,)).fetchone()
 		if row is None:
-			return
+			return False
 
 		filesindexer = self.update_iter.files
 
@@ -250,6 +264,9 @@ class Index(SignalEmitter):
 		else:
 			raise TypeError
 
+		return True
+
+	def _commit_partial_update(self):
 		for i in self.update_iter.partial_update_iter():
 			pass
 
@@ -298,6 +298,50 @@ class LinksView(IndexView):
 			n += self._n_list_links(child.id, direction)
 		return n
 
+	def list_sources_affected_by_move(self, oldroot, newroot):
+		'''List pages with links that may need updating after a move
+
+		Combines in a single query the links that target C{oldroot} or
+		one of its children and the floating links that are anchored on
+		the basename of C{oldroot}, originate below its parent and do
+		not resolve into the C{newroot} section.
+
+		The query reads the links table as-is. Callers must make sure
+		the links of pages that moved along with C{oldroot} have been
+		re-indexed at their new location first, else those pages show
+		up as affected sources with stale targets.
+
+		@param oldroot: the L{Path} of the page before the move
+		@param newroot: the L{Path} of the page after the move
+		@returns: a list of unique L{Path} objects for the link sources
+		'''
+		parent = oldroot.parent
+		rows = self.db.execute(
+			'SELECT DISTINCT sp.name FROM links '
+			'JOIN pages sp ON links.source = sp.id '
+			'JOIN pages tp ON links.target = tp.id '
+			'WHERE links.source <> ? '
+			'AND ( '
+			'	tp.name = ? OR tp.name LIKE ? '
+			'	OR ( '
+			'		links.rel = ? AND links.anchorkey = ? '
+			'		AND (? OR sp.name LIKE ?) '
+			'		AND tp.name <> ? AND tp.name NOT LIKE ? '
+			'	) '
+			') '
+			'ORDER BY sp.name',
+			(
+				ROOT_ID,
+				oldroot.name, oldroot.name + ':%',
+				HREF_REL_FLOATING, natural_sort_key(oldroot.basename),
+				parent.isroot, parent.name + ':%',
+				newroot.name, newroot.name + ':%',
+			)
+		).fetchall()
+			# Page names cannot contain "%" or "_", so names can be used
+			# in LIKE patterns without escaping
+		return [Path(row['name']) for row in rows]
+
 	def list_floating_links(self, basename):
 		anchorkey = natural_sort_key(basename)
 		for row in self.db.execute(
@@ -390,10 +390,11 @@ class PagesViewInternal(object):
 
 			if relnames:
 				# Check if we are anchored in non-existing part
-				keys = list(map(natural_sort_key, relnames))
-				if anchor_key in keys:
-					i = [c for c, k in enumerate(keys) if k == anchor_key][-1]
-					return (start, start_id, relnames[:i] + href.parts())
+				# Scan from the end, so we find the last matching part
+				# directly and short-circuit without building key lists
+				for i in range(len(relnames) - 1, -1, -1):
+					if natural_sort_key(relnames[i]) == anchor_key:
+						return (start, start_id, relnames[:i] + href.parts())
 
 			if ignore_link_placeholders:
 				c = self.db.execute(
@@ -578,6 +579,28 @@ class PagesView(IndexView):
 		):
 			yield PageIndexRecord(row)
 
+	def list_existing_numbered_names(self, name):
+		'''List names of existing pages matching C{name} or C{name}
+		followed by a suffix, like "name 1", "name 2", ...
+
+		Used by L{Notebook.get_new_page()} to find a free page name with
+		a single query instead of one index lookup per candidate.
+
+		@param name: a page name as string
+		@returns: a list of page names as strings
+		'''
+		rows = self.db.execute(
+			'SELECT name FROM pages '
+			'WHERE (name = ? OR name LIKE ?) '
+			'AND (is_link_placeholder = 0 OR n_children > 0)',
+			(name, name + ' %')
+		).fetchall()
+			# Page names cannot contain "%" or "_", so name is safe to
+			# use in a LIKE pattern without escaping.
+			# Placeholders without children do not block a new page,
+			# matching the hascontent / haschildren check in get_new_page
+		return [row['name'] for row in rows]
+
 	def walk(self, path=None):
 		'''Generator function to yield all pages in the index, depth
 		first
@@ -5,6 +5,8 @@
 import re
 import sys
 
+from functools import lru_cache
+
 from .page import Path
 
 from zim.newfs import File, Folder, _EOL, SEP
@@ -17,6 +19,7 @@ FILE_TYPE_ATTACHMENT = 2
 
 _fs_encoding = sys.getfilesystemencoding()
 
+@lru_cache(maxsize=4096)
 def encode_filename(pagename):
 	'''Encode a pagename to a filename
 
@@ -95,7 +98,10 @@ class FilesLayout(NotebookLayout):
 		return file, folder
 
 	def get_attachments_folder(self, pagename):
-		file, folder = self.map_page(pagename)
+		# Only needs the folder part of map_page(), skip constructing
+		# the page source file
+		path = encode_filename(pagename.name)
+		folder = self.root.folder(path) if path else self.root
 		return FilesAttachmentFolder(folder, self.default_extension)
 
 	def map_file(self, file):
@@ -166,6 +172,8 @@ class FilesLayout(NotebookLayout):
 
 class FilesAttachmentFolder(object):
 
+	__slots__ = ('_inner_fs_object', '_default_extension')
+
 	def __init__(self, folder, default_extension):
 		self._inner_fs_object = folder
 		self._default_extension = default_extension
@@ -6,13 +6,17 @@
 
 import os
 import re
+import time
+import bisect
 import weakref
 import logging
 import threading
+import collections
 
 logger = logging.getLogger('zim.notebook')
 
-from functools import partial
+from functools import partial, lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 import zim.templates
 import zim.formats
@@ -20,11 +24,12 @@ import zim.formats
 from zim.fs import File, Dir, SEP
 from zim.newfs import LocalFolder
 from zim.config import INIConfigFile, String, ConfigDefinitionByClass, Boolean, Choice
+from zim.config import SectionedConfigDict
 from zim.errors import Error
 from zim.utils import natural_sort_key
 from zim.newfs.helpers import TrashNotSupportedError
 from zim.config import HierarchicDict
-from zim.parsing import link_type, is_win32_path_re
+from zim.parsing import link_type
 from zim.signals import ConnectorMixin, SignalEmitter, SIGNAL_NORMAL
 
 from .operations import notebook_state, NOOP, SimpleAsyncOperation, ongoing_operation
@@ -32,6 +37,26 @@ from .page import Path, Page, HRef, HREF_REL_ABSOLUTE, HREF_REL_FLOATING, HREF_R
 from .index import IndexNotFoundError, LINK_DIR_BACKWARD
 
 DATA_FORMAT_VERSION = (0, 4)
+DATA_FORMAT_VERSION_STRING = '.'.join(map(str, DATA_FORMAT_VERSION))
+	# NOTE: when comparing against a stored version string, parse it to
+	# an int tuple first - comparing tuples of strings orders "10"
+	# before "9"
+
+
+_notebook_config_cache = {}
+	# Cache for parsed "notebook.zim" files: file path -> (mtime, sections)
+	# where sections is a list of (name, values) pairs as fed to parse().
+	# Keeping the parsed data per process avoids re-reading and re-parsing
+	# the config file every time a Notebook or NotebookInfo is instantiated
+	# for the same location.
+_notebook_config_cache_lock = threading.Lock()
+
+
+def _stat_mtime(file):
+	try:
+		return os.stat(file.path).st_mtime_ns
+	except OSError:
+		return None
 
 
 class NotebookConfig(INIConfigFile):
@@ -40,14 +65,40 @@ class NotebookConfig(INIConfigFile):
 	# TODO - unify this call with NotebookInfo ?
 
 	def __init__(self, file):
-		INIConfigFile.__init__(self, file)
+		mtime = _stat_mtime(file)
+		cached = None
+		if mtime is not None:
+			with _notebook_config_cache_lock:
+				entry = _notebook_config_cache.get(file.path)
+			if entry is not None and entry[0] == mtime:
+				cached = entry[1]
+
+		if cached is not None:
+			# Warm cache: skip reading and parsing the file
+			SectionedConfigDict.__init__(self)
+			self.file = file
+			with self.block_signals('changed'):
+				for name, values in cached:
+					self[name].input(values)
+			self.set_modified(False)
+		else:
+			INIConfigFile.__init__(self, file)
+			if mtime is not None \
+			and not any(isinstance(s, list) for s in self.values()):
+				sections = [
+					(name, list(section._input.items()))
+						for name, section in self.items()
+				]
+				with _notebook_config_cache_lock:
+					_notebook_config_cache[file.path] = (mtime, sections)
+
 		if os.name == 'nt':
 			endofline = 'dos'
 		else:
 			endofline = 'unix'
 		name = file.dir.basename if hasattr(file, 'dir') else file.parent().basename # HACK zim.fs and zim.newfs compat
 		self['Notebook'].define((
-			('version', String('.'.join(map(str, DATA_FORMAT_VERSION)))),
+			('version', String(DATA_FORMAT_VERSION_STRING)),
 			('name', String(name)),
 			('interwiki', String(None)),
 			('home', ConfigDefinitionByClass(Path('Home'))),
@@ -58,6 +109,11 @@ class NotebookConfig(INIConfigFile):
 			('disable_trash', Boolean(False)),
 		))
 
+	def write(self):
+		with _notebook_config_cache_lock:
+			_notebook_config_cache.pop(self.file.path, None)
+		INIConfigFile.write(self)
+
 
 def _resolve_relative_config(dir, config):
 	# Some code shared between Notebook and NotebookInfo
@@ -81,7 +137,31 @@ def _resolve_relative_config(dir, config):
 	return icon, document_root
 
 
+def _relative_config_path(val, dir):
+	# Counterpart of _resolve_relative_config: normalize a File or Dir
+	# property to a string, relative to the notebook folder when
+	# possible. Attempting relpath() directly saves decomposing the path
+	# twice for an ischild() check first.
+	try:
+		rel = val.relpath(dir)
+	except AssertionError: # not below dir
+		return val.user_path or val.path
+	else:
+		return './' + rel
+
+
+_iswritable_cache = {} # dir path -> (timestamp, result)
+_ISWRITABLE_CACHE_TIMEOUT = 60 # seconds before re-probing the folder
+
+
 def _iswritable(dir):
+	# Cache the result per folder path - especially on windows the probe
+	# is expensive and both new_from_dir() and __init__() need it.
+	# Expire after a timeout to still pick up permission changes.
+	entry = _iswritable_cache.get(dir.path)
+	if entry is not None and time.time() - entry[0] < _ISWRITABLE_CACHE_TIMEOUT:
+		return entry[1]
+
 	if os.name == 'nt':
 		# Test access - (iswritable turns out to be unreliable
 		# for folders on windows..)
@@ -90,15 +170,26 @@ def _iswritable(dir):
 			f.write('Test')
 			f.remove(cleanup=False)
 		except:
-			return False
+			writable = False
 		else:
-			return True
+			writable = True
 	else:
-		return dir.iswritable()
+		writable = dir.iswritable()
+
+	_iswritable_cache[dir.path] = (time.time(), writable)
+	return writable
+
+
+_cache_dir_cache = {} # dir path -> cache dir
 
 
 def _cache_dir_for_dir(dir):
 	# Consider using md5 for path name here, like thumbnail spec
+	# Pure function of dir.path, so memoize the result
+	cache_dir = _cache_dir_cache.get(dir.path)
+	if cache_dir is not None:
+		return cache_dir
+
 	from zim.config import XDG_CACHE_HOME
 
 	if os.name == 'nt':
@@ -106,7 +197,9 @@ def _cache_dir_for_dir(dir):
 	else:
 		path = 'notebook-' + dir.path.replace('/', '_').strip('_')
 
-	return XDG_CACHE_HOME.subdir(('zim', path))
+	cache_dir = XDG_CACHE_HOME.subdir(('zim', path))
+	_cache_dir_cache[dir.path] = cache_dir
+	return cache_dir
 
 
 class PageError(Error):
@@ -147,11 +240,70 @@ def assert_index_uptodate(method):
 	return wrapper
 
 
+_simple_page_link_re = re.compile(r'^[^:/@?\\]+$')
+	# Quick positive test for the common case of a plain page link:
+	# none of the url / email / path / interwiki patterns checked by
+	# link_type() can match without one of these characters, so a
+	# match here means link_type() would return 'page'. Links that do
+	# contain one of these characters still go through link_type().
+
+
+_file_prefix_re = re.compile(r'^(?:~|file:/|/|[A-Za-z]:/)')
+	# Prefixes that make a file link absolute or relative to the
+	# document root - see resolve_file(). Matching once and dispatching
+	# on the result is cheaper than a chain of startswith() calls.
+
+
+_ROOT_DIR = Dir('/')
+	# Shared fallback for resolve_file() when no document root is set,
+	# Dir objects are immutable so no need to construct one per call
+
+
+_cached_href_from_wiki_link = lru_cache(maxsize=4096)(HRef.new_from_wiki_link)
+	# Pages often repeat the same link text many times (e.g. lists of
+	# siblings), so memoizing the parse turns duplicates into a dict
+	# lookup. Safe to share instances: HRef objects are never mutated
+	# once constructed.
+
+
 _NOTEBOOK_CACHE = weakref.WeakValueDictionary()
 
 
 from zim.plugins import ExtensionBase, extendable
 
+class _StorePageJob(object):
+	'''Wrapper for a job submitted to the background store thread
+
+	Exposes the part of the C{threading.Thread} interface that
+	L{SimpleAsyncOperation} relies on, so a single pooled worker thread
+	can be reused instead of constructing a new thread per save.
+	'''
+
+	__slots__ = ('_worker', '_future')
+
+	def __init__(self, executor, func):
+		self._worker = None
+
+		def main():
+			self._worker = threading.current_thread()
+			func()
+
+		self._future = executor.submit(main)
+
+	def is_alive(self):
+		return not self._future.done()
+
+	def join(self):
+		self._future.exception()
+			# Waits for the job to finish; any exception is already
+			# handled by the job itself, so do not re-raise here
+
+	def __eq__(self, other):
+		# Compare equal to the thread currently running the job, so
+		# re-entrancy checks against threading.current_thread() work
+		return other is self or (self._worker is not None and other is self._worker)
+
+
 class NotebookExtension(ExtensionBase):
 	'''Base class for extending the notebook
 
@@ -238,8 +390,9 @@ class Notebook(ConnectorMixin, SignalEmitter):
 		from .layout import FilesLayout
 
 		config = NotebookConfig(dir.file('notebook.zim'))
-		endofline = config['Notebook']['endofline']
-		shared = config['Notebook']['shared']
+		section = config['Notebook']
+		endofline = section['endofline']
+		shared = section['shared']
 
 		subdir = dir.subdir('.zim')
 		if not shared and subdir.exists() and _iswritable(subdir):
@@ -279,6 +432,23 @@ class Notebook(ConnectorMixin, SignalEmitter):
 			logger.info('Notebook read-only: %s', folder.path)
 
 		self._page_cache = weakref.WeakValueDictionary()
+		self._page_cache_strong = collections.OrderedDict()
+			# Bounded LRU with strong references in front of the weakref
+			# cache. Without it Page objects are garbage collected as
+			# soon as the caller drops them and get_page() re-constructs
+			# the page on the very next call.
+		self._page_cache_keys = []
+			# Sorted list of the keys in _page_cache, lets
+			# flush_page_cache() find all cached names in a namespace by
+			# bisecting instead of scanning every key. May contain stale
+			# names for pages that were garbage collected; compacted
+			# lazily in _cache_page_key().
+		self._store_executor = None
+			# Lazily created single worker thread for store_page_async()
+		self._attachments_dir_cache = collections.OrderedDict()
+			# Bounded cache for get_attachments_dir() - the mapping from
+			# page name to folder is deterministic, but building it per
+			# link adds up when resolving many file links on one page
 
 		self.name = None
 		self.icon = None
@@ -303,8 +473,16 @@ class Notebook(ConnectorMixin, SignalEmitter):
 				self._page_cache[row['name']].haschildren = False
 				self.emit('page-info-changed', self._page_cache[row['name']])
 
+		def on_page_row_inserted(o, row):
+			# A new row changes index attributes of a Page object cached
+			# before the page existed, e.g. "haschildren". Drop the
+			# strong reference so an unreferenced object is rebuilt from
+			# the index on next use instead of being served stale
+			self._page_cache_strong.pop(row['name'], None)
+
 		self.index.update_iter.pages.connect('page-row-changed', on_page_row_changed)
 		self.index.update_iter.pages.connect('page-row-deleted', on_page_row_deleted)
+		self.index.update_iter.pages.connect('page-row-inserted', on_page_row_inserted)
 
 		self.connectto(self.properties, 'changed', self.on_properties_changed)
 		self.on_properties_changed(self.properties)
@@ -322,7 +500,7 @@ class Notebook(ConnectorMixin, SignalEmitter):
 		except AssertionError:
 			uri = None
 
-		return NotebookInfo(uri, **self.config['Notebook'])
+		return NotebookInfo(uri, **self.properties)
 
 	@notebook_state
 	def save_properties(self, **properties):
@@ -339,19 +517,13 @@ class Notebook(ConnectorMixin, SignalEmitter):
 		icon = properties.get('icon')
 		if icon and not isinstance(icon, str):
 			assert isinstance(icon, File)
-			if icon.ischild(dir):
-				properties['icon'] = './' + icon.relpath(dir)
-			else:
-				properties['icon'] = icon.user_path or icon.path
+			properties['icon'] = _relative_config_path(icon, dir)
 
 		# Check document root is relative
 		root = properties.get('document_root')
 		if root and not isinstance(root, str):
 			assert isinstance(root, Dir)
-			if root.ischild(dir):
-				properties['document_root'] = './' + root.relpath(dir)
-			else:
-				properties['document_root'] = root.user_path or root.path
+			properties['document_root'] = _relative_config_path(root, dir)
 
 		# Set home page as string
 		if 'home' in properties and isinstance(properties['home'], Path):
@@ -375,6 +547,16 @@ class Notebook(ConnectorMixin, SignalEmitter):
 			self.icon = None
 		self.document_root = document_root
 
+		# Precompute what relative_filepath() needs per call - the roots
+		# only change when the properties do
+		if document_root:
+			self._document_root_folder = LocalFolder(document_root.path) # XXX
+			self._docroot_under_nbroot = \
+				self._document_root_folder.ischild(self.layout.root)
+		else:
+			self._document_root_folder = None
+			self._docroot_under_nbroot = False
+
 	def suggest_link(self, source, word):
 		'''Suggest a link Path for 'word' or return None if no suggestion is
 		found. By default we do not do any suggestion but plugins can
@@ -409,6 +591,7 @@ class Notebook(ConnectorMixin, SignalEmitter):
 			page = self._page_cache[path.name]
 			assert isinstance(page, Page)
 			page._check_source_etag()
+			self._cache_page_strong(page)
 			return page
 		else:
 			file, folder = self.layout.map_page(path)
@@ -427,8 +610,28 @@ class Notebook(ConnectorMixin, SignalEmitter):
 
 			# TODO - set haschildren if page maps to a store namespace
 			self._page_cache[path.name] = page
+			self._cache_page_key(path.name)
+			self._cache_page_strong(page)
 			return page
 
+	_PAGE_CACHE_STRONG_SIZE = 128
+
+	def _cache_page_strong(self, page):
+		cache = self._page_cache_strong
+		cache[page.name] = page
+		cache.move_to_end(page.name)
+		while len(cache) > self._PAGE_CACHE_STRONG_SIZE:
+			cache.popitem(last=False)
+
+	def _cache_page_key(self, name):
+		keys = self._page_cache_keys
+		i = bisect.bisect_left(keys, name)
+		if i == len(keys) or keys[i] != name:
+			keys.insert(i, name)
+			if len(keys) > 2 * len(self._page_cache) + 32:
+				# Compact stale keys of garbage collected pages
+				self._page_cache_keys = sorted(self._page_cache.keys())
+
 	def get_new_page(self, path):
 		'''Like get_page() but guarantees the page does not yet exist
 		by adding a number to the name to make it unique.
@@ -444,11 +647,20 @@ class Notebook(ConnectorMixin, SignalEmitter):
 		'''
 		i = 0
 		base = path.name
-		page = self.get_page(path)
+
+		existing = frozenset(self.pages.list_existing_numbered_names(base))
+			# One query for all taken names instead of an index lookup
+			# per candidate
+		name = base
+		while name in existing:
+			i += 1
+			name = base + ' %i' % i
+
+		page = self.get_page(Path(name))
 		while page.hascontent or page.haschildren:
+			# Fallback covers pages not (yet) known to the index
 			i += 1
-			path = Path(base + ' %i' % i)
-			page = self.get_page(path)
+			page = self.get_page(Path(base + ' %i' % i))
 		return page
 
 	@notebook_state
@@ -462,19 +674,31 @@ class Notebook(ConnectorMixin, SignalEmitter):
 
 		@param path: a L{Path} object
 		'''
-		names = [path.name]
-		ns = path.name + ':'
-		names.extend(k for k in list(self._page_cache.keys()) if k.startswith(ns))
+		# All names below the namespace form a contiguous range in the
+		# sorted key list: ':' + 1 == ';' is a strict upper bound
+		keys = self._page_cache_keys
+		lo = bisect.bisect_left(keys, path.name + ':')
+		hi = bisect.bisect_left(keys, path.name + ';')
+		names = keys[lo:hi]
+		del keys[lo:hi]
+
+		i = bisect.bisect_left(keys, path.name)
+		if i < len(keys) and keys[i] == path.name:
+			del keys[i]
+		names.append(path.name)
+
 		for name in names:
 			if name in self._page_cache:
 				page = self._page_cache[name]
 				assert not page.modified, 'BUG: Flushing page with unsaved changes'
 				page.valid = False
 				del self._page_cache[name]
+			self._page_cache_strong.pop(name, None)
+			self._attachments_dir_cache.pop(name, None)
 
 	def get_home_page(self):
 		'''Returns a L{Page} object for the home page'''
-		return self.get_page(self.config['Notebook']['home'])
+		return self.get_page(self.properties['home'])
 
 	@notebook_state
 	def store_page(self, page):
@@ -493,16 +717,48 @@ class Notebook(ConnectorMixin, SignalEmitter):
 		page.modified = False
 		self.emit('stored-page', page)
 
+	@notebook_state
+	def store_pages_batch(self, pages):
+		'''Save the data from multiple pages in the storage backend
+
+		Like L{store_page()} but wraps the index updates for all pages
+		in a single update pass, so the database commit cost is paid
+		once instead of once per page. Intended for bulk updates like
+		rewriting links after a move.
+
+		@param pages: an iterable of L{Page} objects
+		@emits: store-page before storing each page
+		@emits: stored-page for each page on success
+		'''
+		pages = list(pages)
+		files = []
+		for page in pages:
+			assert page.valid, 'BUG: page object no longer valid'
+			logger.debug('Store page: %s', page)
+			self.emit('store-page', page)
+			page._store()
+			file, folder = self.layout.map_page(page)
+			files.append(file)
+
+		self.index.update_files(files)
+
+		for page in pages:
+			page.modified = False
+			self.emit('stored-page', page)
+
 	@notebook_state
 	def store_page_async(self, page, parsetree):
 		assert page.valid, 'BUG: page object no longer valid'
 		logger.debug('Store page in background: %s', page)
 		self.emit('store-page', page)
 		error = threading.Event()
-		thread = threading.Thread(
-			target=partial(self._store_page_async_thread_main, page, parsetree, error)
+		if self._store_executor is None:
+			self._store_executor = ThreadPoolExecutor(
+				max_workers=1, thread_name_prefix='zim-store-page')
+		thread = _StorePageJob(
+			self._store_executor,
+			partial(self._store_page_async_thread_main, page, parsetree, error)
 		)
-		thread.start()
 		pre_modified = page.modified
 		op = SimpleAsyncOperation(
 			notebook=self,
@@ -573,25 +829,48 @@ class Notebook(ConnectorMixin, SignalEmitter):
 
 		self.emit('move-page', path, newpath)
 		try:
-			n_links = self.links.n_list_links_section(path, LINK_DIR_BACKWARD)
+			self.pages.lookup_by_pagename(path)
 		except IndexNotFoundError:
 			raise PageNotFoundError(path)
+
+		# Counting links on a whole section costs a SQL query per page,
+		# so only do the sanity check when its outcome is visible
+		check_links = logger.isEnabledFor(logging.DEBUG)
+		if check_links:
+			n_links = self.links.n_list_links_section(path, LINK_DIR_BACKWARD)
+
 		self._move_file_and_folder(path, newpath)
 		self.flush_page_cache(path)
 		self.emit('moved-page', path, newpath)
 
 		if update_links:
-			for p in self._update_links_in_moved_page(path, newpath):
+			# Memoize link resolution for the duration of this move; the
+			# same link text recurs many times across pages and no pages
+			# are created or deleted while the links are being updated
+			resolve_cache = {}
+			pages_resolve_link = self.pages.resolve_link
+
+			def resolve_link(source, href):
+				key = (source.name, href.rel, href.names)
+				try:
+					return resolve_cache[key]
+				except KeyError:
+					target = pages_resolve_link(source, href)
+					resolve_cache[key] = target
+					return target
+
+			for p in self._update_links_in_moved_page(path, newpath, resolve_link):
 				yield p
 
-			for p in self._update_links_to_moved_page(path, newpath):
+			for p in self._update_links_to_moved_page(path, newpath, resolve_link):
 				yield p
 
-			new_n_links = self.links.n_list_links_section(newpath, LINK_DIR_BACKWARD)
-			if new_n_links != n_links:
-				logger.warn('Number of links after move (%i) does not match number before move (%i)', new_n_links, n_links)
-			else:
-				logger.debug('Number of links after move does match number before move (%i)', new_n_links)
+			if check_links:
+				new_n_links = self.links.n_list_links_section(newpath, LINK_DIR_BACKWARD)
+				if new_n_links != n_links:
+					logger.warn('Number of links after move (%i) does not match number before move (%i)', new_n_links, n_links)
+				else:
+					logger.debug('Number of links after move does match number before move (%i)', new_n_links)
 
 	def _move_file_and_folder(self, path, newpath):
 		file, folder = self.layout.map_page(path)
@@ -647,139 +926,199 @@ class Notebook(ConnectorMixin, SignalEmitter):
 			self.index.file_moved(old, new)
 
 
-	def _update_links_in_moved_page(self, oldroot, newroot):
+	def _update_links_in_moved_page(self, oldroot, newroot, resolve=None):
 		# Find (floating) links that originate from the moved page
 		# check if they would resolve different from the old location
+
+		# Snapshot only the distinct sources up front instead of
+		# materializing all link objects; iterating the live query is
+		# not safe because the loop below stores pages and thereby
+		# rewrites the links table
+		sources = []
 		seen = set()
-		for link in list(self.links.list_links_section(newroot)):
+		for link in self.links.list_links_section(newroot):
 			if link.source.name not in seen:
-				if link.source == newroot:
-					oldpath = oldroot
-				else:
-					oldpath = oldroot + link.source.relname(newroot)
-
-				yield link.source
-				self._update_moved_page(link.source, oldpath, newroot, oldroot)
 				seen.add(link.source.name)
+				sources.append(link.source)
+
+		# All sources are newroot itself or children of it, so the old
+		# name follows from swapping the prefix - no need for the
+		# relname() + child() round-trip per page
+		newroot_name = newroot.name
+		skip = len(newroot_name) + 1
+		oldprefix = oldroot.name + ':'
+
+		for source in sources:
+			if source.name == newroot_name:
+				oldpath = oldroot
+			else:
+				oldpath = Path(oldprefix + source.name[skip:])
+
+			yield source
+			self._update_moved_page(source, oldpath, newroot, oldroot, resolve)
 
-	def _update_moved_page(self, path, oldpath, newroot, oldroot):
+	def _update_moved_page(self, path, oldpath, newroot, oldroot, resolve=None):
 		logger.debug('Updating links in page moved from %s to %s', oldpath, path)
 		page = self.get_page(path)
 		tree = page.get_parsetree()
 		if not tree:
 			return
 
+		# Hoist attribute lookups out of the per-link loop
+		is_page_link = _simple_page_link_re.match
+		resolve_link = resolve or self.pages.resolve_link
+		new_href = _cached_href_from_wiki_link
+		VisitorSkip = zim.formats.VisitorSkip
+
+		modified = [False]
+
+		def update_link_tag(elt, page, target, href):
+			modified[0] = True
+			return self._update_link_tag(elt, page, target, href)
+
 		def replacefunc(elt):
 			text = elt.attrib['href']
-			if link_type(text) != 'page':
-				raise zim.formats.VisitorSkip
+			if text.startswith('+'):
+				raise VisitorSkip # HREF_REL_RELATIVE, no need to parse
+			elif not is_page_link(text) and link_type(text) != 'page':
+				raise VisitorSkip
 
-			href = HRef.new_from_wiki_link(text)
+			href = new_href(text)
 			if href.rel == HREF_REL_RELATIVE:
-				raise zim.formats.VisitorSkip
+				raise VisitorSkip
 			elif href.rel == HREF_REL_ABSOLUTE:
-				oldtarget = self.pages.resolve_link(page, href)
+				oldtarget = resolve_link(page, href)
 				if oldtarget == oldroot:
-					return self._update_link_tag(elt, page, newroot, href)
+					return update_link_tag(elt, page, newroot, href)
 				elif oldtarget.ischild(oldroot):
 					newtarget = newroot + oldtarget.relname(oldroot)
-					return self._update_link_tag(elt, page, newtarget, href)
+					return update_link_tag(elt, page, newtarget, href)
 				else:
-					raise zim.formats.VisitorSkip
+					raise VisitorSkip
 			else:
 				assert href.rel == HREF_REL_FLOATING
-				newtarget = self.pages.resolve_link(page, href)
-				oldtarget = self.pages.resolve_link(oldpath, href)
+				newtarget = resolve_link(page, href)
+				oldtarget = resolve_link(oldpath, href)
 
 				if oldtarget == oldroot:
-					return self._update_link_tag(elt, page, newroot, href)
+					return update_link_tag(elt, page, newroot, href)
 				elif oldtarget.ischild(oldroot):
-					oldanchor = self.pages.resolve_link(oldpath, HRef(HREF_REL_FLOATING, href.parts()[0]))
+					oldanchor = resolve_link(oldpath, HRef(HREF_REL_FLOATING, href.parts()[0]))
 					if oldanchor.ischild(oldroot):
-						raise zim.formats.VisitorSkip # oldtarget cannot be trusted
+						raise VisitorSkip # oldtarget cannot be trusted
 					else:
 						newtarget = newroot + oldtarget.relname(oldroot)
-						return self._update_link_tag(elt, page, newtarget, href)
+						return update_link_tag(elt, page, newtarget, href)
 				elif newtarget != oldtarget:
 					# Redirect back to old target
-					return self._update_link_tag(elt, page, oldtarget, href)
+					return update_link_tag(elt, page, oldtarget, href)
 				else:
-					raise zim.formats.VisitorSkip
+					raise VisitorSkip
 
 		tree.replace(zim.formats.LINK, replacefunc)
+		if not modified[0]:
+			# No link needed rewriting, skip re-serializing the page.
+			# Do re-index it at the new location: storing used to do
+			# this as a side effect and _update_links_to_moved_page()
+			# depends on the links of all moved pages being resolved
+			# against the post-move tree
+			file, folder = self.layout.map_page(path)
+			self.index.update_file(file)
+			return
+
 		page.set_parsetree(tree)
 		self.store_page(page)
 
-	def _update_links_to_moved_page(self, oldroot, newroot):
-		# 1. Check remaining placeholders, update pages causing them
-		seen = set()
-		try:
-			oldroot = self.pages.lookup_by_pagename(oldroot)
-		except IndexNotFoundError:
-			pass
-		else:
-			for link in list(self.links.list_links_section(oldroot, LINK_DIR_BACKWARD)):
-				if link.source.name not in seen:
-					yield link.source
-					self._move_links_in_page(link.source, oldroot, newroot)
-					seen.add(link.source.name)
-
-		# 2. Check for links that have anchor of same name as the moved page
-		# and originate from a (grand)child of the parent of the moved page
-		# and no longer resolve to the moved page
-		parent = oldroot.parent
-		for link in list(self.links.list_floating_links(oldroot.basename)):
-			if link.source.name not in seen \
-			and link.source.ischild(parent) \
-			and not (
-				link.target == newroot
-				or link.target.ischild(newroot)
-			):
-				yield link.source
-				self._move_links_in_page(link.source, oldroot, newroot)
-				seen.add(link.source.name)
-
-	def _move_links_in_page(self, path, oldroot, newroot):
+	def _update_links_to_moved_page(self, oldroot, newroot, resolve=None):
+		# Find pages that either link to the moved page or one of its
+		# children (check remaining placeholders, update pages causing
+		# them) or have a floating link with an anchor of the same name
+		# as the moved page that originates from a (grand)child of the
+		# parent of the moved page and no longer resolves to the moved
+		# page. Both cases are matched with a single indexed query that
+		# also takes care of de-duplicating the sources.
+		pages = []
+		files = []
+		for source in self.links.list_sources_affected_by_move(oldroot, newroot):
+			yield source
+			page = self._move_links_in_page(source, oldroot, newroot, resolve)
+			if page is not None:
+				pages.append(page)
+			else:
+				# No link needed rewriting, but the links rows of the
+				# page must still be re-resolved so placeholders left
+				# by the move get cleaned up - same reasoning as in
+				# _update_moved_page()
+				file, folder = self.layout.map_page(source)
+				files.append(file)
+
+		if pages:
+			self.store_pages_batch(pages)
+		if files:
+			self.index.update_files(files)
+
+	def _move_links_in_page(self, path, oldroot, newroot, resolve=None):
 		logger.debug('Updating page %s to move link from %s to %s', path, oldroot, newroot)
 		page = self.get_page(path)
 		tree = page.get_parsetree()
 		if not tree:
 			return
 
+		# Hoist attribute lookups out of the per-link loop
+		is_page_link = _simple_page_link_re.match
+		resolve_link = resolve or self.pages.resolve_link
+		new_href = _cached_href_from_wiki_link
+		VisitorSkip = zim.formats.VisitorSkip
+
+		modified = [False]
+
+		def update_link_tag(elt, page, target, href):
+			modified[0] = True
+			return self._update_link_tag(elt, page, target, href)
+
 		def replacefunc(elt):
 			text = elt.attrib['href']
-			if link_type(text) != 'page':
-				raise zim.formats.VisitorSkip
+			if not is_page_link(text) and link_type(text) != 'page':
+				raise VisitorSkip
 
-			href = HRef.new_from_wiki_link(text)
-			target = self.pages.resolve_link(page, href)
+			href = new_href(text)
+			target = resolve_link(page, href)
 
 			if target == oldroot:
-				return self._update_link_tag(elt, page, newroot, href)
+				return update_link_tag(elt, page, newroot, href)
 			elif target.ischild(oldroot):
 				newtarget = newroot.child(target.relname(oldroot))
-				return self._update_link_tag(elt, page, newtarget, href)
+				return update_link_tag(elt, page, newtarget, href)
 
 			elif href.rel == HREF_REL_FLOATING \
 			and natural_sort_key(href.parts()[0]) == natural_sort_key(oldroot.basename) \
 			and page.ischild(oldroot.parent):
-				targetrecord = self.pages.lookup_by_pagename(target)
+				try:
+					target_exists = self.pages.lookup_by_pagename(target).exists()
+				except IndexNotFoundError:
+					# Target resolved from a stale links row and has no
+					# index record at all - treat like a non-existing
+					# target and rewrite instead of aborting the move
+					target_exists = False
 				if not target.ischild(oldroot.parent) \
-				or not targetrecord.exists():
+				or not target_exists:
 					# An link that was anchored to the moved page,
 					# but now resolves somewhere higher in the tree
 					# Or a link that no longer resolves
 					if len(href.parts()) == 1:
-						return self._update_link_tag(elt, page, newroot, href)
+						return update_link_tag(elt, page, newroot, href)
 					else:
 						mynewroot = newroot.child(':'.join(href.parts()[1:]))
-						return self._update_link_tag(elt, page, mynewroot, href)
+						return update_link_tag(elt, page, mynewroot, href)
 
-			raise zim.formats.VisitorSkip
+			raise VisitorSkip
 
 		tree.replace(zim.formats.LINK, replacefunc)
+		if not modified[0]:
+			return None # no link needed rewriting, skip re-serialization
+
 		page.set_parsetree(tree)
-		self.store_page(page)
+		return page # caller takes care of storing the page
 
 	def _update_link_tag(self, elt, source, target, oldhref):
 		if oldhref.rel == HREF_REL_ABSOLUTE: # prefer to keep absolute links
@@ -788,7 +1127,11 @@ class Notebook(ConnectorMixin, SignalEmitter):
 			newhref = self.pages.create_link(source, target)
 
 		text = newhref.to_wiki_link()
-		if elt.gettext() == elt.get('href'):
+		if len(elt) == 1 and isinstance(elt[0], str):
+			oldtext = elt[0] # fast path, avoid gettext() walking children
+		else:
+			oldtext = elt.gettext()
+		if oldtext == elt.get('href'):
 			elt[:] = [text]
 		elt.set('href', text)
 		return elt
@@ -945,7 +1288,7 @@ class Notebook(ConnectorMixin, SignalEmitter):
 
 		logger.debug('Trash page: %s', path)
 
-		if self.config['Notebook']['disable_trash']:
+		if self.properties['disable_trash']:
 			raise TrashNotSupportedError('disable_trash is set')
 
 		self.emit('delete-page', path)
@@ -978,14 +1321,18 @@ class Notebook(ConnectorMixin, SignalEmitter):
 			except IndexNotFoundError:
 				pass
 			else:
-				pages = set(
+				paths = set(
 					l.source for l in self.links.list_links_section(path, LINK_DIR_BACKWARD))
 
-				for p in pages:
+				pages = []
+				for p in paths:
 					yield p
 					page = self.get_page(p)
-					self._remove_links_in_page(page, path)
-					self.store_page(page)
+					if self._remove_links_in_page(page, path):
+						pages.append(page)
+
+				if pages:
+					self.store_pages_batch(pages)
 
 		# let everybody know what happened
 		self.emit('deleted-page', path)
@@ -996,23 +1343,34 @@ class Notebook(ConnectorMixin, SignalEmitter):
 		if not tree:
 			return
 
+		# Hoist attribute lookups out of the per-link loop
+		is_page_link = _simple_page_link_re.match
+		lookup_from_user_input = self.pages.lookup_from_user_input
+		VisitorSkip = zim.formats.VisitorSkip
+
+		modified = [False]
+
 		def replacefunc(elt):
 			href = elt.attrib['href']
-			type = link_type(href)
-			if type != 'page':
-				raise zim.formats.VisitorSkip
+			if not is_page_link(href) and link_type(href) != 'page':
+				raise VisitorSkip
 
-			hrefpath = self.pages.lookup_from_user_input(href, page)
+			hrefpath = lookup_from_user_input(href, page)
 			#~ print('LINK', hrefpath)
 			if hrefpath == path \
 			or hrefpath.ischild(path):
 				# Replace the link by it's text
+				modified[0] = True
 				return zim.formats.DocumentFragment(*elt)
 			else:
-				raise zim.formats.VisitorSkip
+				raise VisitorSkip
 
 		tree.replace(zim.formats.LINK, replacefunc)
+		if not modified[0]:
+			return False # no link needed removing, skip re-serialization
+
 		page.set_parsetree(tree)
+		return True
 
 	def resolve_file(self, filename, path=None):
 		'''Resolve a file or directory path relative to a page or
@@ -1044,24 +1402,35 @@ class Notebook(ConnectorMixin, SignalEmitter):
 		@returns: a L{File} object.
 		'''
 		assert isinstance(filename, str)
-		filename = filename.replace('\\', '/')
-		if filename.startswith('~') or filename.startswith('file:/'):
-			return File(filename)
-		elif filename.startswith('/'):
-			dir = self.document_root or Dir('/')
-			return dir.file(filename)
-		elif is_win32_path_re.match(filename):
-			if not filename.startswith('/'):
-				filename = '/' + filename
-				# make absolute on Unix
+		if filename.startswith('file://') and not '\\' in filename:
+			# Fast path for absolute file URIs, common when re-resolving
+			# links during export
 			return File(filename)
+
+		if '\\' in filename:
+			filename = filename.replace('\\', '/')
+
+		if filename[:1] in ('~', '/', 'f') or filename[1:2] == ':':
+			m = _file_prefix_re.match(filename)
+		else:
+			m = None # common case: plain relative name, skip the regex
+		if m:
+			prefix = m.group(0)
+			if prefix == '/':
+				dir = self.document_root or _ROOT_DIR
+				return dir.file(filename)
+			elif prefix == '~' or prefix == 'file:/':
+				return File(filename)
+			else: # win32 drive letter, make absolute on Unix
+				return File('/' + filename)
 		else:
+			# Joining with the separator ourselves is cheaper than having
+			# File.__init__ flatten and join a tuple
 			if path:
 				dir = self.get_attachments_dir(path)
-				return File((dir.path, filename)) # XXX LocalDir --> File -- will need get_abspath to resolve
+				return File(dir.path + SEP + filename) # XXX LocalDir --> File -- will need get_abspath to resolve
 			else:
-				dir = Dir(self.layout.root.path) # XXX
-				return File((dir, filename))
+				return File(self.layout.root.path + SEP + filename) # XXX
 
 	def relative_filepath(self, file, path=None):
 		'''Get a file path relative to the notebook or page
@@ -1090,54 +1459,76 @@ class Notebook(ConnectorMixin, SignalEmitter):
 		@returns: relative file path as string, or C{None} when no
 		relative path was found
 		'''
-		from zim.newfs import LocalFile, LocalFolder
+		attachments_dir = self.get_attachments_dir(path) if path else None
+		return self._relative_filepath(file, attachments_dir)
+
+	def _relative_filepath(self, file, attachments_dir):
+		from zim.newfs import LocalFile
 		file = LocalFile(file.path) # XXX
 		notebook_root = self.layout.root
-		document_root = LocalFolder(self.document_root.path) if self.document_root else None# XXX
+		document_root = self._document_root_folder # XXX
+		docroot_under_nbroot = self._docroot_under_nbroot
 
 		rootdir = '/'
 		mydir = '.' + SEP
-		updir = '..' + SEP
+
+		# All the candidate parents boil down to a prefix check on the
+		# pathnames tuple, so test and slice those directly instead of
+		# going through ischild() + relpath() which each re-do the work
+		file_names = file.pathnames
+
+		def isbelow(folder):
+			names = folder.pathnames
+			return len(names) < len(file_names) \
+				and file_names[:len(names)] == names
+
+		def downpath(folder):
+			return SEP.join(file_names[len(folder.pathnames):])
 
 		# Look within the notebook
-		if path:
-			attachments_dir = self.get_attachments_dir(path)
-
-			if file.ischild(attachments_dir):
-				return mydir + file.relpath(attachments_dir)
-			elif document_root and notebook_root \
-			and document_root.ischild(notebook_root) \
-			and file.ischild(document_root) \
+		if attachments_dir is not None:
+			if isbelow(attachments_dir):
+				return mydir + downpath(attachments_dir)
+			elif docroot_under_nbroot \
+			and isbelow(document_root) \
 			and not attachments_dir.ischild(document_root):
 				# special case when document root is below notebook root
 				# the case where document_root == attachment_folder is
 				# already caught by above if clause
-				return rootdir + file.relpath(document_root)
+				return rootdir + downpath(document_root)
 			elif notebook_root \
-			and file.ischild(notebook_root) \
+			and isbelow(notebook_root) \
 			and attachments_dir.ischild(notebook_root):
-				parent = file.commonparent(attachments_dir)
-				uppath = attachments_dir.relpath(parent)
-				downpath = file.relpath(parent)
-				up = 1 + uppath.count('/')
-				return updir * up + downpath
+				# Find the common parent with a single scan over the
+				# pathnames instead of commonparent() + 2x relpath(),
+				# which each walk the same prefix again
+				att_names = attachments_dir.pathnames
+				i = 0
+				for a, b in zip(att_names, file_names):
+					if a != b:
+						break
+					i += 1
+				up = len(att_names) - i
+				return SEP.join(('..',) * up + file_names[i:])
+					# single join, no intermediate "../../.." string
 		else:
-			if document_root and notebook_root \
-			and document_root.ischild(notebook_root) \
-			and file.ischild(document_root):
+			if docroot_under_nbroot \
+			and isbelow(document_root):
 				# special case when document root is below notebook root
-				return rootdir + file.relpath(document_root)
-			elif notebook_root and file.ischild(notebook_root):
-				return mydir + file.relpath(notebook_root)
+				return rootdir + downpath(document_root)
+			elif notebook_root and isbelow(notebook_root):
+				return mydir + downpath(notebook_root)
 
 		# If that fails look for global folders
-		if document_root and file.ischild(document_root):
-			return rootdir + file.relpath(document_root)
+		if document_root and isbelow(document_root):
+			return rootdir + downpath(document_root)
 
 		# Finally check HOME or give up
 		path = file.userpath
 		return path if path.startswith('~') else None
 
+	_ATTACHMENTS_DIR_CACHE_SIZE = 512
+
 	def get_attachments_dir(self, path):
 		'''Get the X{attachment folder} for a specific page
 
@@ -1149,7 +1540,14 @@ class Notebook(ConnectorMixin, SignalEmitter):
 		C{None} is returned the store implementation does not support
 		an attachments folder for this page.
 		'''
-		return self.layout.get_attachments_folder(path)
+		cache = self._attachments_dir_cache
+		folder = cache.get(path.name)
+		if folder is None:
+			folder = self.layout.get_attachments_folder(path)
+			cache[path.name] = folder
+			while len(cache) > self._ATTACHMENTS_DIR_CACHE_SIZE:
+				cache.popitem(last=False)
+		return folder
 
 	def get_template(self, path):
 		'''Get a template for the intial text on new pages
@@ -1167,6 +1565,8 @@ class Notebook(ConnectorMixin, SignalEmitter):
 		'''Returns the name of the template to use for a new page.
 		(To get the contents of the template directly, see L{get_template()})
 		'''
+		if not self.signal_has_handlers('get-page-template'):
+			return 'Default' # common case: no plugin customizes templates
 		return self.emit_return_first('get-page-template', path or Path(':')) or 'Default'
 
 	def eval_new_page_template(self, path, template):
@@ -1179,7 +1579,8 @@ class Notebook(ConnectorMixin, SignalEmitter):
 				'namespace': path.namespace, # backward compat
 			}
 		}
-		self.emit('init-page-template', path, template) # plugin hook
+		if self.signal_has_handlers('init-page-template'):
+			self.emit('init-page-template', path, template) # plugin hook
 		template.process(lines, context)
 
 		parser = zim.formats.get_parser('wiki')
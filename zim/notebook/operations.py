@@ -130,6 +130,14 @@ to aquire the lock. (Since such actions also require the operation
 #   Given that our Gtk interface does not use this, it is
 #   over-engineering.
 #
+#   The resulting contract resembles a reader/writer lock: read-only
+#   calls like Notebook.get_page() or Notebook.resolve_file() are never
+#   blocked and can run concurrently with an ongoing operation, while
+#   mutating entry points (store_page, move_page, delete_page, ...) are
+#   guarded by the "notebook_state" decorator and serialize on the
+#   ongoing operation. New mutating methods must use the decorator;
+#   read-only methods must not.
+#
 
 import threading
 import logging
@@ -346,6 +354,8 @@ class NotebookState(object):
 
 	'''
 
+	__slots__ = ('notebook',)
+
 	def __init__(self, notebook):
 		self.notebook = notebook
 
@@ -346,6 +346,19 @@ class SignalEmitter(object, metaclass=SignalEmitterMeta):
 	def _teardown_signal(self, signal):
 		pass
 
+	def signal_has_handlers(self, signal):
+		'''Check whether any handler is connected for C{signal}
+
+		Allows emitters to skip argument construction for signals that
+		nobody listens to.
+
+		@param signal: the signal name
+		@returns: C{True} when at least one handler (including a default
+		closure) is connected
+		'''
+		assert signal in self.__signals__, 'No such signal: %s::%s' % (self.__class__.__name__, signal)
+		return bool(self._signal_handlers.get(signal))
+
 	def emit(self, signal, *args):
 		# NOTE: do *not* refactor this method as a wrapper around
 		# emit_return_iter() or similar. It is called often enough to justify
@@ -93,6 +93,14 @@ def list_templates(category):
 	return sorted(templates)
 
 
+_template_file_cache = {}
+	# Maps (category, template) to the resolved File, so repeated
+	# lookups skip listing the template data dirs. Entries are
+	# re-validated with an exists() check, cheap compared to the scan.
+	# Template objects themselves are not cached: callers connect
+	# per-use signal handlers to them.
+
+
 def get_template(category, template):
 	'''Returns a Template object for a template name or file path
 	@param category: the template category (e.g. "html"). Use to resolve
@@ -104,21 +112,26 @@ def get_template(category, template):
 	if is_path_re.match(template):
 		file = File(template)
 	else:
-		file = None
-		for dir in data_dirs(('templates', category)):
-			for basename in dir.list():
-				name = basename.rsplit('.')[0] # robust if no '.' in basename
-				if basename == template or name == template:
-					file = dir.file(basename)
-					if file.exists(): # is a file
-						break
-			if file and file.exists():
-				break
+		file = _template_file_cache.get((category, template))
+		if file is not None and file.exists():
+			pass
 		else:
-			file = File(template)
-			if not file.exists():
-				raise PathLookupError(_('Could not find template "%s"') % template)
-					# T: Error message in template lookup
+			file = None
+			for dir in data_dirs(('templates', category)):
+				for basename in dir.list():
+					name = basename.rsplit('.')[0] # robust if no '.' in basename
+					if basename == template or name == template:
+						file = dir.file(basename)
+						if file.exists(): # is a file
+							break
+				if file and file.exists():
+					break
+			else:
+				file = File(template)
+				if not file.exists():
+					raise PathLookupError(_('Could not find template "%s"') % template)
+						# T: Error message in template lookup
+			_template_file_cache[(category, template)] = file
 
 	if not file.exists():
 		raise PathLookupError(_('No such file: %s') % file)